@@ -10,11 +10,17 @@ import streamlit as st
 import os
 import logging
 
+try:
+    # libuv-backed event loop; cuts asyncio dispatch overhead on the
+    # concurrent DB/API calls (not available on Windows)
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 from utils.logging_utils import setup_logging, configure_streamlit_logging
 from config.settings import APP_NAME, DEBUG
 from ui.auth_ui import require_auth
-from ui.assistant_ui import assistant_page
-from ui.chat_ui import chat_page
 
 
 # Set up logging
@@ -35,59 +41,79 @@ st.set_page_config(
 )
 
 
+@st.fragment
+def render_page(user_id):
+    """
+    Render the current page.
+
+    Runs as a fragment so in-page interactions re-execute only the page
+    body, not the auth/bootstrap portion of the script. The sidebar nav
+    lives in main() — fragments may not create widgets in externally
+    created containers like the sidebar.
+    """
+    # Display the appropriate page based on current_page
+    # Page modules are imported lazily so a rerun only pays the import
+    # cost of the page it actually renders (sys.modules caches the rest)
+    if st.session_state["current_page"] == "assistants" or st.session_state["current_page"] == "manage_assistant":
+        from ui.assistant_ui import assistant_page
+        assistant_page(user_id)
+    elif st.session_state["current_page"] == "chat":
+        from ui.chat_ui import chat_page
+        chat_page(user_id)
+    elif st.session_state["current_page"] == "chat_history":
+        from ui.chat_ui import chat_page
+        chat_page(user_id)  # Chat page handles both chat and chat history
+    else:
+        st.error(f"Unknown page: {st.session_state['current_page']}")
+
+
 def main():
     """Main application entry point."""
     # Display app title in sidebar
     st.sidebar.title(APP_NAME)
-    
+
     # Initialize session state for navigation
     if "current_page" not in st.session_state:
         st.session_state["current_page"] = "assistants"
-    
+
     # Require authentication
     user_data = require_auth()
-    
+
     if not user_data:
         # User is not authenticated, auth page is displayed by require_auth
         return
-    
+
     # Get user ID
     if isinstance(user_data, dict) and "user" in user_data and isinstance(user_data["user"], dict):
         user_id = user_data["user"].get("id")
     else:
         st.error("User data format is incorrect. Please log out and log in again.")
         return
-    
+
     if not user_id:
         st.error("User ID not found. Please log out and log in again.")
         return
-    
-    # Navigation in sidebar
+
+    # Navigation in sidebar; page switches need a full rerun anyway so
+    # these buttons stay outside the fragment
     st.sidebar.title("Navigation")
-    
-    if st.sidebar.button("Assistants", use_container_width=True, 
+
+    if st.sidebar.button("Assistants", use_container_width=True,
                          type="primary" if st.session_state["current_page"] == "assistants" else "secondary"):
         st.session_state["current_page"] = "assistants"
         st.session_state["current_assistant_id"] = None
         st.session_state["current_thread_id"] = None
         st.rerun()
-    
+
     if st.sidebar.button("Tutor Session History", use_container_width=True,
                          type="primary" if st.session_state["current_page"] == "chat_history" else "secondary"):
         st.session_state["current_page"] = "chat_history"
         st.session_state["current_assistant_id"] = None
         st.session_state["current_thread_id"] = None
         st.rerun()
-    
-    # Display the appropriate page based on current_page
-    if st.session_state["current_page"] == "assistants" or st.session_state["current_page"] == "manage_assistant":
-        assistant_page(user_id)
-    elif st.session_state["current_page"] == "chat":
-        chat_page(user_id)
-    elif st.session_state["current_page"] == "chat_history":
-        chat_page(user_id)  # Chat page handles both chat and chat history
-    else:
-        st.error(f"Unknown page: {st.session_state['current_page']}")
+
+    # Page content reruns independently of the auth bootstrap
+    render_page(user_id)
 
 
 if __name__ == "__main__":
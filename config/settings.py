@@ -2,28 +2,80 @@
 Configuration and environment variables for the AI Teaching Assistant Platform.
 """
 
-import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Optional
 
-# Load environment variables from .env file
-load_dotenv(override=True)
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Application settings, loaded once from the environment / .env file."""
+
+    model_config = SettingsConfigDict(env_file=".env", frozen=True, extra="ignore")
+
+    # OpenAI API settings
+    openai_api_key: Optional[str] = None
+
+    # Supabase settings
+    supabase_url: Optional[str] = None
+    supabase_key: Optional[str] = None
+    supabase_db_password: Optional[str] = None
+    supabase_db_url: Optional[str] = None
+
+    # Application settings
+    app_name: str = "AI Teaching Assistant"
+    debug: bool = False
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Get the application settings, parsing the environment only once.
+
+    Returns:
+        The cached, immutable Settings instance
+    """
+    return Settings()
+
+
+_settings = get_settings()
 
 # OpenAI API settings
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_API_KEY = _settings.openai_api_key
 
 # Supabase settings
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-SUPABASE_DB_PASSWORD = os.getenv("SUPABASE_DB_PASSWORD")
+SUPABASE_URL = _settings.supabase_url
+SUPABASE_KEY = _settings.supabase_key
+SUPABASE_DB_PASSWORD = _settings.supabase_db_password
+SUPABASE_DB_URL = _settings.supabase_db_url
 
 # Application settings
-APP_NAME = os.getenv("APP_NAME", "AI Teaching Assistant")
-DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+APP_NAME = _settings.app_name
+DEBUG = _settings.debug
 
 # File upload settings
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt", ".md"}
+ALLOWED_EXT_TUPLE = tuple(ALLOWED_EXTENSIONS)
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB
 
+
+def is_allowed(name: str, size: int) -> bool:
+    """
+    Fast accept check for an upload: size guard plus extension match.
+
+    str.endswith against a tuple is a single C-level loop, cheaper than
+    splitting the extension and hashing it into a set per file.
+
+    Args:
+        name: Name of the file
+        size: Size of the file in bytes
+
+    Returns:
+        True if the file passes the size and extension checks
+    """
+    return size <= MAX_FILE_SIZE and name.lower().endswith(ALLOWED_EXT_TUPLE)
+
+
 # OpenAI model settings
 ASSISTANT_MODEL = "gpt-4-turbo-preview"
 EMBEDDING_MODEL = "text-embedding-3-small"
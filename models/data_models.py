@@ -4,12 +4,19 @@ Uses Pydantic for data validation and serialization.
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, EmailStr, UUID4
+from typing import List, Literal, Optional, Dict, Any, Union
+from typing_extensions import TypedDict
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, UUID4
+
+
+# Shared pydantic v2 config: rows coming back from Supabase may carry
+# extra columns, and validated objects are treated as immutable
+_ROW_CONFIG = ConfigDict(extra="ignore", frozen=True, str_strip_whitespace=True)
 
 
 class User(BaseModel):
     """User model representing a teacher or administrator."""
+    model_config = _ROW_CONFIG
     id: UUID4
     email: EmailStr
     full_name: str
@@ -21,6 +28,7 @@ class User(BaseModel):
 
 class School(BaseModel):
     """School model representing an educational institution."""
+    model_config = _ROW_CONFIG
     id: UUID4
     name: str
     subscription_tier: str = "basic"
@@ -30,6 +38,7 @@ class School(BaseModel):
 
 class Document(BaseModel):
     """Document model representing an uploaded curriculum document."""
+    model_config = _ROW_CONFIG
     id: UUID4
     user_id: UUID4
     assistant_id: Optional[UUID4] = None
@@ -43,6 +52,7 @@ class Document(BaseModel):
 
 class Assistant(BaseModel):
     """Assistant model representing an AI teaching assistant."""
+    model_config = _ROW_CONFIG
     id: UUID4
     user_id: UUID4
     name: str
@@ -54,6 +64,7 @@ class Assistant(BaseModel):
 
 class ChatThread(BaseModel):
     """Chat thread model representing a conversation with an assistant."""
+    model_config = _ROW_CONFIG
     id: UUID4
     assistant_id: UUID4
     user_id: UUID4
@@ -65,6 +76,7 @@ class ChatThread(BaseModel):
 
 class ChatMessage(BaseModel):
     """Chat message model representing a message in a chat thread."""
+    model_config = _ROW_CONFIG
     id: UUID4
     thread_id: UUID4
     role: str  # "user" or "assistant"
@@ -72,6 +84,60 @@ class ChatMessage(BaseModel):
     created_at: datetime
 
 
+# Read-path row types
+#
+# Rows returned from Supabase are rendered directly by the UI without
+# pydantic instantiation; these TypedDicts document their shape at zero
+# runtime cost. total=False because list reads project only the columns
+# each view renders. The BaseModel classes above are reserved for paths
+# that actually need validation.
+
+class AssistantRow(TypedDict, total=False):
+    """Raw assistant row as returned by Supabase."""
+    id: str
+    user_id: str
+    name: str
+    description: Optional[str]
+    openai_assistant_id: str
+    created_at: str
+    last_used: Optional[str]
+
+
+class DocumentRow(TypedDict, total=False):
+    """Raw document row as returned by Supabase."""
+    id: str
+    user_id: str
+    assistant_id: str
+    filename: str
+    file_type: str
+    file_size: int
+    openai_file_id: str
+    storage_path: str
+    file_url: str
+    status: str
+    created_at: str
+
+
+class ChatThreadRow(TypedDict, total=False):
+    """Raw chat thread row as returned by Supabase."""
+    id: str
+    assistant_id: str
+    user_id: str
+    name: Optional[str]
+    openai_thread_id: str
+    created_at: str
+    last_message_at: str
+
+
+class ChatMessageRow(TypedDict, total=False):
+    """Raw chat message row as returned by Supabase."""
+    id: str
+    thread_id: str
+    role: Literal["user", "assistant"]
+    content: str
+    created_at: str
+
+
 # Request and Response Models
 
 class UserCreate(BaseModel):
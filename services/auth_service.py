@@ -5,8 +5,13 @@ Handles user authentication using Supabase.
 
 import logging
 from typing import Dict, Any, Tuple
-from datetime import datetime
-from supabase import create_client, Client
+
+import httpx
+import streamlit as st
+# ClientOptions from the package root is the sync options class
+# (aliased to SyncClientOptions on newer releases); the base class in
+# supabase.lib.client_options does not accept httpx_client everywhere
+from supabase import create_client, Client, ClientOptions
 
 from config.settings import SUPABASE_URL, SUPABASE_KEY
 
@@ -15,10 +20,25 @@ class AuthService:
     """Service class for handling authentication with Supabase."""
 
     def __init__(self):
-        """Initialize the Supabase client."""
+        """Initialize the Supabase client with a shared HTTP connection pool."""
         try:
             print(f"\n[DEBUG] Connecting to Supabase URL: {SUPABASE_URL}\n")
-            self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+            # HTTP/2 multiplexes concurrent PostgREST calls over one
+            # TCP/TLS connection instead of opening one per request
+            http_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60
+                ),
+                timeout=30
+            )
+            self.client: Client = create_client(
+                SUPABASE_URL,
+                SUPABASE_KEY,
+                options=ClientOptions(httpx_client=http_client)
+            )
         except Exception as e:
             logging.error(f"Failed to initialize Supabase client: {e}")
             raise
@@ -127,29 +147,36 @@ class AuthService:
             bool: True if user exists or was created, False otherwise
         """
         try:
-            user_id = user_data.id
-            
-            # Check if user exists in users table
-            response = self.client.table("users").select("*").eq("id", user_id).execute()
-            
-            if not response.data:
-                # User doesn't exist, create a new record
-                insert_data = {
-                    "id": user_id,
-                    "email": user_data.email,
-                    "full_name": user_data.user_metadata.get("full_name", "") if user_data.user_metadata else "",
-                    "created_at": datetime.utcnow().isoformat()
-                }
-                
-                self.client.table("users").insert(insert_data).execute()
-                logging.info(f"Created new user record for {user_data.email}")
-            
+            # Idempotent upsert: a single round trip that inserts the row
+            # if missing and is a no-op otherwise, with no prior SELECT
+            self.client.table("users").upsert({
+                "id": user_data.id,
+                "email": user_data.email,
+                "full_name": user_data.user_metadata.get("full_name", "") if user_data.user_metadata else ""
+            }, on_conflict="id", ignore_duplicates=True).execute()
+
             return True
-            
+
+
         except Exception as e:
             logging.error(f"Failed to ensure user exists: {e}")
             return False
 
+    def refresh_session(self) -> Any:
+        """
+        Refresh the current auth session's tokens.
+
+        Returns:
+            The refreshed session or None if the refresh failed
+        """
+        try:
+            response = self.client.auth.refresh_session()
+            return response.session if response else None
+
+        except Exception as e:
+            logging.error(f"Failed to refresh session: {e}")
+            return None
+
     def get_user(self) -> Dict[str, Any]:
         """
         Get the current user's information.
@@ -175,5 +202,19 @@ class AuthService:
             return {}
 
 
+@st.cache_resource(show_spinner=False)
+def get_auth_service() -> AuthService:
+    """
+    Get the shared AuthService instance.
+
+    Streamlit guarantees one instance per process, so reruns and
+    re-imports reuse the same Supabase client and its connection pool.
+
+    Returns:
+        The process-wide AuthService instance
+    """
+    return AuthService()
+
+
 # Create a singleton instance
-auth_service = AuthService()
+auth_service = get_auth_service()
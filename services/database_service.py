@@ -4,11 +4,68 @@ Handles database operations using Supabase.
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+import time
 from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from uuid import UUID
 
-from services.auth_service import auth_service
+import streamlit as st
+
+from config.settings import MAX_THREAD_MESSAGES
+from models.data_models import ChatMessageRow
+from services.auth_service import get_auth_service
+from services.pg_pool import get_pool
+
+
+# TTL for the in-process single-row cache below; primary-key lookups are
+# repeated many times within a single Streamlit rerun
+_ROW_CACHE_TTL = 15
+
+
+def _row_cache_epoch() -> int:
+    """
+    Get the current cache epoch; bumping it every TTL window expires entries.
+    """
+    return int(time.monotonic() // _ROW_CACHE_TTL)
+
+
+def _record_to_dict(row: Any) -> Dict[str, Any]:
+    """
+    Convert an asyncpg record to the same dict shape PostgREST returns,
+    so callers see strings for UUID and timestamp columns either way.
+    """
+    result = {}
+    for key, value in dict(row).items():
+        if isinstance(value, UUID):
+            result[key] = str(value)
+        elif isinstance(value, datetime):
+            result[key] = value.isoformat()
+        else:
+            result[key] = value
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _get_assistant_cached(assistant_id: str, _epoch: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a single assistant row, memoized for the current epoch.
+    """
+    response = db_service.client.table("assistants").select("*").eq("id", assistant_id).execute()
+    if response.data:
+        return response.data[0]
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _get_chat_thread_cached(thread_id: str, _epoch: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a single chat thread row, memoized for the current epoch.
+    """
+    response = db_service.client.table("chat_threads").select("*").eq("id", thread_id).execute()
+    if response.data:
+        return response.data[0]
+    return None
 
 
 class DatabaseService:
@@ -16,7 +73,7 @@ class DatabaseService:
 
     def __init__(self):
         """Initialize the database service using the auth service's Supabase client."""
-        self.client = auth_service.client
+        self.client = get_auth_service().client
 
     # Assistant operations
 
@@ -38,8 +95,7 @@ class DatabaseService:
                 "user_id": user_id,
                 "name": name,
                 "description": description,
-                "openai_assistant_id": openai_assistant_id,
-                "created_at": datetime.utcnow().isoformat()
+                "openai_assistant_id": openai_assistant_id
             }).execute()
 
             if response.data:
@@ -61,32 +117,44 @@ class DatabaseService:
             Assistant data or None if not found
         """
         try:
-            response = self.client.table("assistants").select("*").eq("id", assistant_id).execute()
-            if response.data:
-                return response.data[0]
-            return None
+            return _get_assistant_cached(assistant_id, _row_cache_epoch())
 
         except Exception as e:
             logging.error(f"Failed to get assistant: {e}")
             return None
 
-    def get_user_assistants(self, user_id: str) -> List[Dict[str, Any]]:
+    def get_user_assistants(self, user_id: str, limit: int = 50,
+                            before: Optional[str] = None) -> tuple:
         """
-        Get all assistants for a user.
+        Get a page of assistants for a user, newest first.
+
+        Keyset pagination bounds the work per call regardless of how many
+        assistants the user has accumulated; the (user_id, created_at)
+        index serves each page as an ordered scan.
 
         Args:
             user_id: ID of the user
+            limit: Maximum number of assistants to return
+            before: Optional created_at cursor; only assistants created
+                before it are returned
 
         Returns:
-            List of assistant data
+            Tuple of (assistant rows, next cursor or None if exhausted)
         """
         try:
-            response = self.client.table("assistants").select("*").eq("user_id", user_id).execute()
-            return response.data or []
+            query = self.client.table("assistants") \
+                .select("id, name, description, created_at, last_used") \
+                .eq("user_id", user_id)
+            if before:
+                query = query.lt("created_at", before)
+            response = query.order("created_at", desc=True).limit(limit).execute()
+            rows = response.data or []
+            next_cursor = rows[-1]["created_at"] if len(rows) == limit else None
+            return rows, next_cursor
 
         except Exception as e:
             logging.error(f"Failed to get user assistants: {e}")
-            return []
+            return [], None
 
     def update_assistant(self, assistant_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -101,6 +169,7 @@ class DatabaseService:
         """
         try:
             response = self.client.table("assistants").update(data).eq("id", assistant_id).execute()
+            _get_assistant_cached.cache_clear()
             if response.data:
                 return response.data[0]
             return None
@@ -121,6 +190,7 @@ class DatabaseService:
         """
         try:
             response = self.client.table("assistants").delete().eq("id", assistant_id).execute()
+            _get_assistant_cached.cache_clear()
             return bool(response.data)
 
         except Exception as e:
@@ -130,7 +200,8 @@ class DatabaseService:
     # Document operations
 
     def create_document(self, user_id: str, assistant_id: str, filename: str, file_type: str,
-                       file_size: int, openai_file_id: str, storage_path: str, file_url: str) -> Optional[Dict[str, Any]]:
+                       file_size: int, openai_file_id: str, storage_path: str, file_url: str,
+                       sha256: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Create a new document in the database.
 
@@ -141,6 +212,7 @@ class DatabaseService:
             file_type: Type of the file
             file_size: Size of the file in bytes
             openai_file_id: ID of the file in OpenAI
+            sha256: Content hash of the file, used for upload dedupe
 
         Returns:
             Created document data or None if creation failed
@@ -155,7 +227,7 @@ class DatabaseService:
                 "openai_file_id": openai_file_id,
                 "storage_path": storage_path,
                 "file_url": file_url,
-                "created_at": datetime.utcnow().isoformat()
+                "sha256": sha256
             }).execute()
 
             if response.data:
@@ -166,10 +238,38 @@ class DatabaseService:
             logging.error(f"Failed to create document: {e}")
             return None
 
+    def get_document_by_hash(self, assistant_id: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an assistant's document by content hash.
+
+        Args:
+            assistant_id: ID of the assistant
+            sha256: SHA-256 hex digest of the file contents
+
+        Returns:
+            Document data or None if no document matches
+        """
+        try:
+            response = self.client.table("documents").select("*") \
+                .eq("assistant_id", assistant_id).eq("sha256", sha256) \
+                .limit(1).execute()
+
+            if response.data:
+                return response.data[0]
+            return None
+
+        except Exception as e:
+            logging.error(f"Failed to get document by hash: {e}")
+            return None
+
     def get_assistant_documents(self, assistant_id: str) -> List[Dict[str, Any]]:
         """
         Get all documents for an assistant.
 
+        Only the columns the list view renders are projected; the heavy
+        fields (storage_path, file_url, openai_file_id) are available via
+        get_document_full.
+
         Args:
             assistant_id: ID of the assistant
 
@@ -177,13 +277,35 @@ class DatabaseService:
             List of document data
         """
         try:
-            response = self.client.table("documents").select("*").eq("assistant_id", assistant_id).execute()
+            response = self.client.table("documents") \
+                .select("id, filename, file_type, file_size, status, created_at") \
+                .eq("assistant_id", assistant_id).execute()
             return response.data or []
 
         except Exception as e:
             logging.error(f"Failed to get assistant documents: {e}")
             return []
 
+    def get_document_full(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a document with all columns, including storage and OpenAI fields.
+
+        Args:
+            document_id: ID of the document
+
+        Returns:
+            Document data or None if not found
+        """
+        try:
+            response = self.client.table("documents").select("*").eq("id", document_id).execute()
+            if response.data:
+                return response.data[0]
+            return None
+
+        except Exception as e:
+            logging.error(f"Failed to get document: {e}")
+            return None
+
     def delete_document(self, document_id: str) -> bool:
         """
         Delete a document.
@@ -202,16 +324,40 @@ class DatabaseService:
             logging.error(f"Failed to delete document: {e}")
             return False
 
+    def delete_documents_bulk(self, document_ids: List[str]) -> bool:
+        """
+        Delete multiple documents in a single round-trip.
+
+        Args:
+            document_ids: IDs of the documents to delete
+
+        Returns:
+            True if deletion was successful, False otherwise
+        """
+        if not document_ids:
+            return True
+
+        try:
+            response = self.client.table("documents").delete() \
+                .in_("id", document_ids).execute()
+            return bool(response.data)
+
+        except Exception as e:
+            logging.error(f"Failed to delete documents: {e}")
+            return False
+
     # Chat operations
 
-    def create_chat_thread(self, assistant_id: str, user_id: str, openai_thread_id: str) -> Optional[Dict[str, Any]]:
+    def create_chat_thread(self, assistant_id: str, user_id: str,
+                           openai_thread_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Create a new chat thread.
 
         Args:
             assistant_id: ID of the assistant
             user_id: ID of the user
-            openai_thread_id: ID of the thread in OpenAI
+            openai_thread_id: ID of the thread in OpenAI; None when the
+                OpenAI thread is created lazily at the first prompt
 
         Returns:
             Created thread data or None if creation failed
@@ -220,9 +366,7 @@ class DatabaseService:
             response = self.client.table("chat_threads").insert({
                 "assistant_id": assistant_id,
                 "user_id": user_id,
-                "openai_thread_id": openai_thread_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "last_message_at": datetime.utcnow().isoformat()
+                "openai_thread_id": openai_thread_id
             }).execute()
 
             if response.data:
@@ -233,6 +377,31 @@ class DatabaseService:
             logging.error(f"Failed to create chat thread: {e}")
             return None
 
+    def update_chat_thread(self, thread_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update a chat thread.
+
+        Args:
+            thread_id: ID of the thread to update
+            data: Data to update
+
+        Returns:
+            Updated thread data or None if update failed
+        """
+        try:
+            response = self.client.table("chat_threads").update(data).eq("id", thread_id).execute()
+
+            # Drop the cached row so readers see the update immediately
+            _get_chat_thread_cached.cache_clear()
+
+            if response.data:
+                return response.data[0]
+            return None
+
+        except Exception as e:
+            logging.error(f"Failed to update chat thread: {e}")
+            return None
+
     def get_chat_thread(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a chat thread by ID.
@@ -244,10 +413,7 @@ class DatabaseService:
             Thread data or None if not found
         """
         try:
-            response = self.client.table("chat_threads").select("*").eq("id", thread_id).execute()
-            if response.data:
-                return response.data[0]
-            return None
+            return _get_chat_thread_cached(thread_id, _row_cache_epoch())
 
         except Exception as e:
             logging.error(f"Failed to get chat thread: {e}")
@@ -257,14 +423,52 @@ class DatabaseService:
         """
         Get all chat threads for a user.
 
+        The assistant name is embedded via a PostgREST join so callers
+        never need a per-thread get_assistant lookup (the N+1 pattern).
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            List of thread data with embedded assistant names
+        """
+        try:
+            response = self.client.table("chat_threads") \
+                .select("id, name, assistant_id, openai_thread_id, created_at, last_message_at, assistants(name)") \
+                .eq("user_id", user_id).execute()
+            return response.data or []
+
+        except Exception as e:
+            logging.error(f"Failed to get user chat threads: {e}")
+            return []
+
+    def get_user_chat_threads_with_assistants(self, user_id: str, limit: int = 50,
+                                              offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get a page of a user's chat threads with assistant names embedded.
+
+        Reads the chat_threads_list view, which joins the assistant name
+        and formats created_day/last_day server-side, so the history page
+        loads in a single round trip with display-ready rows and pages
+        server-side so the round trip stays O(page size) no matter how
+        much history the user has.
+
         Args:
             user_id: ID of the user
+            limit: Maximum number of threads to return
+            offset: Number of threads to skip, for paging
 
         Returns:
-            List of thread data
+            List of thread data, newest first, with assistant_name,
+            created_day and last_day columns
         """
         try:
-            response = self.client.table("chat_threads").select("*").eq("user_id", user_id).execute()
+            response = self.client.table("chat_threads_list") \
+                .select("id, name, assistant_id, openai_thread_id, created_day, last_day, assistant_name") \
+                .eq("user_id", user_id) \
+                .order("last_message_at", desc=True) \
+                .range(offset, offset + limit - 1) \
+                .execute()
             return response.data or []
 
         except Exception as e:
@@ -284,40 +488,46 @@ class DatabaseService:
             Created message data or None if creation failed
         """
         try:
-            # Update the thread's last_message_at timestamp
-            self.client.table("chat_threads").update({
-                "last_message_at": datetime.utcnow().isoformat()
-            }).eq("id", thread_id).execute()
-
-            # Create the message
-            response = self.client.table("chat_messages").insert({
-                "thread_id": thread_id,
-                "role": role,
-                "content": content,
-                "created_at": datetime.utcnow().isoformat()
+            # Insert the message and touch the thread's last_message_at
+            # atomically in a single round trip
+            response = self.client.rpc("insert_message_and_touch_thread", {
+                "p_thread": thread_id,
+                "p_role": role,
+                "p_content": content
             }).execute()
 
             if response.data:
-                return response.data[0]
+                return response.data[0] if isinstance(response.data, list) else response.data
             return None
 
         except Exception as e:
             logging.error(f"Failed to create chat message: {e}")
             return None
 
-    def get_thread_messages(self, thread_id: str) -> List[Dict[str, Any]]:
+    def get_thread_messages(self, thread_id: str, limit: int = MAX_THREAD_MESSAGES,
+                            before: Optional[str] = None) -> List[ChatMessageRow]:
         """
-        Get all messages for a thread.
+        Get the most recent messages for a thread.
+
+        The (thread_id, created_at) composite index serves this as an
+        ordered index scan, so the LIMIT terminates early.
 
         Args:
             thread_id: ID of the thread
+            limit: Maximum number of messages to return
+            before: Optional created_at cursor; only messages older than
+                this are returned (for paging back through history)
 
         Returns:
-            List of message data
+            List of message data in chronological order
         """
         try:
-            response = self.client.table("chat_messages").select("*").eq("thread_id", thread_id).order("created_at").execute()
-            return response.data or []
+            query = self.client.table("chat_messages").select("*").eq("thread_id", thread_id)
+            if before:
+                query = query.lt("created_at", before)
+            response = query.order("created_at", desc=True).limit(limit).execute()
+            # Rows come back newest-first; reverse for chronological display
+            return list(reversed(response.data or []))
 
         except Exception as e:
             logging.error(f"Failed to get thread messages: {e}")
@@ -334,17 +544,180 @@ class DatabaseService:
             True if deletion was successful, False otherwise
         """
         try:
-            # Delete all messages in the thread
-            self.client.table("chat_messages").delete().eq("thread_id", thread_id).execute()
-            
-            # Delete the thread
+            # Messages are removed by the ON DELETE CASCADE foreign key,
+            # so a single statement deletes the thread and its messages
             response = self.client.table("chat_threads").delete().eq("id", thread_id).execute()
+            _get_chat_thread_cached.cache_clear()
             return bool(response.data)
 
         except Exception as e:
             logging.error(f"Failed to delete chat thread: {e}")
             return False
 
+    # Async operations (asyncpg)
+    # These serve the hot read/write paths from a shared connection pool,
+    # avoiding a fresh HTTP round trip per call.
+
+    async def aget_assistant(self, assistant_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an assistant by ID using the Postgres pool.
+
+        Args:
+            assistant_id: ID of the assistant
+
+        Returns:
+            Assistant data or None if not found
+        """
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as con:
+                row = await con.fetchrow(
+                    "select * from assistants where id = $1", assistant_id
+                )
+            return _record_to_dict(row) if row else None
+
+        except Exception as e:
+            logging.error(f"Failed to get assistant: {e}")
+            return None
+
+    async def aget_user_assistants(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all assistants for a user using the Postgres pool.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            List of assistant data
+        """
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as con:
+                rows = await con.fetch(
+                    "select * from assistants where user_id = $1", user_id
+                )
+            return [_record_to_dict(row) for row in rows]
+
+        except Exception as e:
+            logging.error(f"Failed to get user assistants: {e}")
+            return []
+
+    async def aget_assistant_documents(self, assistant_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all documents for an assistant using the Postgres pool.
+
+        Args:
+            assistant_id: ID of the assistant
+
+        Returns:
+            List of document data
+        """
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as con:
+                rows = await con.fetch(
+                    "select * from documents where assistant_id = $1", assistant_id
+                )
+            return [_record_to_dict(row) for row in rows]
+
+        except Exception as e:
+            logging.error(f"Failed to get assistant documents: {e}")
+            return []
+
+    async def aget_chat_thread(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a chat thread by ID using the Postgres pool.
+
+        Args:
+            thread_id: ID of the thread
+
+        Returns:
+            Thread data or None if not found
+        """
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as con:
+                row = await con.fetchrow(
+                    "select * from chat_threads where id = $1", thread_id
+                )
+            return _record_to_dict(row) if row else None
+
+        except Exception as e:
+            logging.error(f"Failed to get chat thread: {e}")
+            return None
+
+    async def aget_thread_messages(self, thread_id: str,
+                                   limit: int = MAX_THREAD_MESSAGES) -> List[ChatMessageRow]:
+        """
+        Get the most recent messages for a thread using the Postgres pool.
+
+        Bounded the same way as get_thread_messages: newest-first with a
+        LIMIT so the composite index terminates the scan early, then
+        reversed for chronological order.
+
+        Args:
+            thread_id: ID of the thread
+            limit: Maximum number of messages to return
+
+        Returns:
+            List of message data in chronological order
+        """
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as con:
+                rows = await con.fetch(
+                    "select * from chat_messages where thread_id = $1"
+                    " order by created_at desc limit $2",
+                    thread_id, limit
+                )
+            return [_record_to_dict(row) for row in reversed(rows)]
+
+        except Exception as e:
+            logging.error(f"Failed to get thread messages: {e}")
+            return []
+
+    async def acreate_chat_message(self, thread_id: str, role: str, content: str) -> Optional[Dict[str, Any]]:
+        """
+        Create a new chat message using the Postgres pool.
+
+        Args:
+            thread_id: ID of the thread
+            role: Role of the message sender ("user" or "assistant")
+            content: Content of the message
+
+        Returns:
+            Created message data or None if creation failed
+        """
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as con:
+                async with con.transaction():
+                    await con.execute(
+                        "update chat_threads set last_message_at = now() where id = $1",
+                        thread_id
+                    )
+                    row = await con.fetchrow(
+                        "insert into chat_messages (thread_id, role, content)"
+                        " values ($1, $2, $3) returning *",
+                        thread_id, role, content
+                    )
+            return _record_to_dict(row) if row else None
+
+        except Exception as e:
+            logging.error(f"Failed to create chat message: {e}")
+            return None
+
+
+@st.cache_resource(show_spinner=False)
+def get_db_service() -> DatabaseService:
+    """
+    Get the shared DatabaseService instance.
+
+    Returns:
+        The process-wide DatabaseService instance
+    """
+    return DatabaseService()
+
 
 # Create a singleton instance
-db_service = DatabaseService()
+db_service = get_db_service()
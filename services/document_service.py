@@ -3,82 +3,126 @@ Document service for the AI Teaching Assistant Platform.
 Handles document processing and file management.
 """
 
+import asyncio
+import hashlib
+import io
 import os
 import logging
 import tempfile
-from typing import Dict, Any, Optional, BinaryIO
-import magic
-import PyPDF2
-from docx import Document as DocxDocument
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Any, List, Optional, Tuple, BinaryIO, Union
 
-from config.settings import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from config.settings import ALLOWED_EXTENSIONS, ALLOWED_EXT_TUPLE, MAX_FILE_SIZE, is_allowed
 from services.openai_service import openai_service
 from services.database_service import db_service
+from utils.pdf_workers import extract_pdf_pages
+
+
+# PDF extraction is CPU-bound inside the parser, so pages fan out across
+# processes; below this page count the pool startup cost isn't worth it
+_PARALLEL_PDF_MIN_PAGES = 4
+# Pages per worker batch, to amortize fork/IPC overhead
+_PDF_PAGE_BATCH = 10
+
+# Built once at import; validate_file runs per upload and shouldn't
+# reallocate the map or re-join the extension list each call
+_ALLOWED_MIMES = {
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "application/msword": ".doc",
+    "text/plain": ".txt",
+    "text/markdown": ".md"
+}
+_ALLOWED_EXT_JOINED = ", ".join(ALLOWED_EXTENSIONS)
+_EXT_TO_MIME = {ext: mime for mime, ext in _ALLOWED_MIMES.items()}
+
+# Plain text has no magic bytes; sniffing it is at best inconclusive
+_TEXT_EXTENSIONS = {".txt", ".md"}
+
+# Header window for the magic sniff; OOXML (.docx) needs more than the
+# leading zip signature to be told apart from a plain archive
+_SNIFF_BYTES = 4096
 
 
 class DocumentService:
     """Service class for handling document processing and file management."""
 
-    def __init__(self):
-        """Initialize the document service."""
-        self.mime = magic.Magic(mime=True)
-
-    def get_file_type(self, file: BinaryIO) -> str:
+    def get_file_type(self, file: BinaryIO, filename: Optional[str] = None) -> str:
         """
         Get the MIME type of a file.
 
         Args:
             file: File object to check
+            filename: Optional name of the file, used as a hint to
+                disambiguate container formats like OOXML
 
         Returns:
-            MIME type of the file
+            MIME type of the file, or an empty string if detection failed
         """
-        # Read the first 2048 bytes for MIME detection
-        header = file.read(2048)
+        # puremagic sniffs header bytes in pure Python; no libmagic
+        # database is loaded into the process
+        import puremagic
+
+        header = file.read(_SNIFF_BYTES)
         file.seek(0)  # Reset file pointer
-        return self.mime.from_buffer(header)
+        try:
+            return puremagic.from_string(header, mime=True, filename=filename)
+        except puremagic.PureError:
+            return ""
 
-    def validate_file(self, file: BinaryIO, filename: str) -> Optional[str]:
+    def validate_file(self, data: Union[bytes, memoryview], filename: str) -> Tuple[Optional[str], str]:
         """
-        Validate a file for upload.
+        Validate an upload held in memory.
+
+        Operates on the buffer directly — size is len(), the MIME sniff
+        reads the head of the same buffer — so there are no seek/read
+        cycles on the underlying stream. The detected MIME type is
+        returned alongside the result so callers don't have to sniff
+        the file a second time.
 
         Args:
-            file: File object to validate
+            data: File contents as bytes or a memoryview
             filename: Name of the file
 
         Returns:
-            Error message if validation fails, None if file is valid
+            Tuple of (error message or None, detected MIME type)
         """
-        # Check file size
-        file.seek(0, os.SEEK_END)
-        size = file.tell()
-        file.seek(0)
+        # Fast accept: one call covers the size guard and the extension
+        # allowlist; only a failing upload pays for working out which
+        # check it tripped
+        if not is_allowed(filename, len(data)):
+            if not filename.lower().endswith(ALLOWED_EXT_TUPLE):
+                ext = os.path.splitext(filename)[1].lower()
+                return f"File type {ext} not allowed. Allowed types: {_ALLOWED_EXT_JOINED}", ""
+            return f"File size exceeds maximum limit of {MAX_FILE_SIZE / (1024 * 1024)}MB", ""
+        ext = os.path.splitext(filename)[1].lower()
 
-        if size > MAX_FILE_SIZE:
-            return f"File size exceeds maximum limit of {MAX_FILE_SIZE / (1024 * 1024)}MB"
+        # Plain text carries no magic bytes to sniff; the extension
+        # check above is the whole story for .txt/.md
+        if ext in _TEXT_EXTENSIONS:
+            return None, _EXT_TO_MIME[ext]
 
-        # Check file extension
-        ext = os.path.splitext(filename)[1].lower()
-        if ext not in ALLOWED_EXTENSIONS:
-            return f"File type {ext} not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        # Check MIME type; the filename hint lets puremagic tell OOXML
+        # containers (.docx) apart from plain zip archives
+        import puremagic
 
-        # Check MIME type
-        mime_type = self.get_file_type(file)
-        allowed_mimes = {
-            "application/pdf": ".pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
-            "application/msword": ".doc",
-            "text/plain": ".txt",
-            "text/markdown": ".md"
-        }
+        try:
+            mime_type = puremagic.from_string(
+                bytes(data[:_SNIFF_BYTES]), mime=True, filename=filename
+            )
+        except puremagic.PureError:
+            # Inconclusive sniff, not a mismatch; the extension already
+            # passed the allowlist, so fall back to its MIME type
+            return None, _EXT_TO_MIME[ext]
 
-        if mime_type not in allowed_mimes:
-            return f"Invalid file type: {mime_type}"
+        if mime_type not in _ALLOWED_MIMES:
+            return f"Invalid file type: {mime_type}", mime_type
 
-        if allowed_mimes[mime_type] != ext:
-            return f"File extension does not match content type"
+        if _ALLOWED_MIMES[mime_type] != ext:
+            return f"File extension does not match content type", mime_type
 
-        return None
+        return None, mime_type
 
     def extract_text(self, file: BinaryIO, file_type: str) -> Optional[str]:
         """
@@ -93,20 +137,55 @@ class DocumentService:
         """
         try:
             if file_type == "application/pdf":
-                # Extract text from PDF
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                import pypdfium2 as pdfium
+
+                # Persist the bytes once so worker processes can open the
+                # PDF independently
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
+                    temp_file.write(file.read())
+                    path = temp_file.name
+
+                try:
+                    pdf = pdfium.PdfDocument(path)
+                    try:
+                        num_pages = len(pdf)
+
+                        if num_pages < _PARALLEL_PDF_MIN_PAGES:
+                            # Small document: sequential extraction avoids
+                            # process-pool startup cost
+                            return "\n".join(
+                                page.get_textpage().get_text_range() or ""
+                                for page in pdf
+                            )
+                    finally:
+                        pdf.close()
+
+                    # Fan page batches out across processes; map preserves
+                    # submission order so pages join back in sequence
+                    batches = [
+                        list(range(start, min(start + _PDF_PAGE_BATCH, num_pages)))
+                        for start in range(0, num_pages, _PDF_PAGE_BATCH)
+                    ]
+                    max_workers = min(os.cpu_count() or 1, 8, len(batches))
+                    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                        results = executor.map(extract_pdf_pages, repeat(path), batches)
+                    return "\n".join(text for batch in results for text in batch)
+                finally:
+                    os.unlink(path)
 
             elif file_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
-                # Extract text from Word document
+                from docx import Document as DocxDocument
+
+                # Extract text from Word document in a single lxml tree
+                # walk; doc.paragraphs would build a Python Paragraph
+                # object per <w:p> just to read its text
                 doc = DocxDocument(file)
-                text = ""
-                for paragraph in doc.paragraphs:
-                    text += paragraph.text + "\n"
-                return text
+                ns = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+                parts = [
+                    "".join(t.text or "" for t in p.iter(ns + "t"))
+                    for p in doc.element.body.iter(ns + "p")
+                ]
+                return "\n".join(parts)
 
             elif file_type in ["text/plain", "text/markdown"]:
                 # Read text file directly
@@ -134,59 +213,103 @@ class DocumentService:
             Processed document data or None if processing failed
         """
         try:
-            # Validate the file
-            error = self.validate_file(file, filename)
+            # Grab the contents once; BytesIO-backed uploads (Streamlit's
+            # UploadedFile) expose their buffer without copying
+            if isinstance(file, io.BytesIO):
+                data = file.getbuffer()
+            else:
+                data = file.read()
+                file.seek(0)
+
+            # Validate the file; the MIME type comes back from the same
+            # sniff, so the header isn't read twice
+            error, file_type = self.validate_file(data, filename)
             if error:
                 logging.error(f"File validation failed: {error}")
                 return None
 
-            # Get file type
-            file_type = self.get_file_type(file)
+            # Size comes from the buffer already in hand
+            file_size = len(data)
+
+            # Dedupe on content hash: re-uploading the same bytes to the
+            # same assistant returns the existing row without touching
+            # Storage. Hashing is milliseconds; the upload is not.
+            digest = hashlib.sha256(data).hexdigest()
+            existing = db_service.get_document_by_hash(assistant_id, digest)
+            if existing:
+                logging.info(f"Skipping duplicate upload of {filename} (sha256 match)")
+                return existing
+
+            # Upload file to Supabase Storage; storage3 accepts bytes or
+            # a path but not a BytesIO, and the contents are already in
+            # hand from the hash above
+            storage_path = f"documents/{assistant_id}/{filename}"
+            response = db_service.client.storage.from_('documents').upload(
+                path=storage_path,
+                file=bytes(data),
+                file_options={"content-type": file_type}
+            )
+
+            if not response:
+                logging.error("Failed to upload file to Supabase Storage")
+                return None
 
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                # Write the uploaded file to the temporary file
-                file.seek(0)
-                temp_file.write(file.read())
-                temp_file.flush()
-
-                # Upload file to Supabase Storage
-                storage_path = f"documents/{assistant_id}/{filename}"
-                with open(temp_file.name, 'rb') as f:
-                    response = db_service.client.storage.from_('documents').upload(
-                        path=storage_path,
-                        file=f,
-                        file_options={"content-type": file_type}
-                    )
-                
-                if not response:
-                    logging.error("Failed to upload file to Supabase Storage")
-                    return None
-                
-                # Get the public URL for the file
-                file_url = db_service.client.storage.from_('documents').get_public_url(storage_path)
-                
-                # Create document in database
-                document = db_service.create_document(
-                    user_id=user_id,
-                    assistant_id=assistant_id,
-                    filename=filename,
-                    file_type=file_type,
-                    file_size=os.path.getsize(temp_file.name),
-                    openai_file_id="manual_upload",  # Placeholder for manual upload
-                    storage_path=storage_path,
-                    file_url=file_url
-                )
+            # Get the public URL for the file
+            file_url = db_service.client.storage.from_('documents').get_public_url(storage_path)
 
-                # Clean up temporary file
-                os.unlink(temp_file.name)
+            # Create document in database
+            document = db_service.create_document(
+                user_id=user_id,
+                assistant_id=assistant_id,
+                filename=filename,
+                file_type=file_type,
+                file_size=file_size,
+                openai_file_id="manual_upload",  # Placeholder for manual upload
+                storage_path=storage_path,
+                file_url=file_url,
+                sha256=digest
+            )
 
-                return document
+            return document
 
         except Exception as e:
             logging.error(f"Failed to process file: {e}")
             return None
 
+    def process_files(self, files: List[BinaryIO], user_id: str, assistant_id: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Process a batch of uploaded files concurrently.
+
+        Each file spends most of its time waiting on the storage upload
+        and database round-trips, so the batch is fanned out across
+        threads and gathered; N uploads cost roughly one upload's
+        latency instead of N.
+
+        Args:
+            files: File objects to process (each with a ``name`` attribute)
+            user_id: ID of the user uploading the files
+            assistant_id: ID of the assistant these files belong to
+
+        Returns:
+            Processed document data per file, None entries for failures
+        """
+        if not files:
+            return []
+
+        if len(files) == 1:
+            file = files[0]
+            return [self.process_file(file, file.name, user_id, assistant_id)]
+
+        async def _gather() -> List[Optional[Dict[str, Any]]]:
+            return await asyncio.gather(*[
+                asyncio.to_thread(
+                    self.process_file, file, file.name, user_id, assistant_id
+                )
+                for file in files
+            ])
+
+        return asyncio.run(_gather())
+
 
 # Create a singleton instance
 document_service = DocumentService()
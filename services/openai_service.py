@@ -3,8 +3,12 @@ OpenAI service for the AI Teaching Assistant Platform.
 Handles interactions with the OpenAI API.
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
+
+import httpx
+import streamlit as st
 from openai import OpenAI
 from openai.types.beta import Assistant, Thread
 from openai.types.beta.threads import Run
@@ -16,9 +20,20 @@ class OpenAIService:
     """Service class for handling OpenAI API operations."""
 
     def __init__(self):
-        """Initialize the OpenAI client."""
+        """Initialize the OpenAI client with a shared HTTP connection pool."""
         try:
-            self.client = OpenAI(api_key=OPENAI_API_KEY)
+            # HTTP/2 multiplexes the many small Assistants API calls
+            # over one TCP/TLS connection instead of opening one each
+            http_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60
+                ),
+                timeout=30
+            )
+            self.client = OpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
         except Exception as e:
             logging.error(f"Failed to initialize OpenAI client: {e}")
             raise
@@ -181,41 +196,93 @@ class OpenAIService:
             logging.error(f"Failed to create OpenAI message: {e}")
             return None
 
+    async def acreate_message(self, thread_id: str, content: str) -> Optional[Dict[str, Any]]:
+        """
+        Async wrapper around create_message, run in a worker thread so
+        it can be gathered with other IO.
+
+        Args:
+            thread_id: ID of the thread
+            content: Content of the message
+
+        Returns:
+            Created message data or None if creation failed
+        """
+        return await asyncio.to_thread(self.create_message, thread_id, content)
+
+    def run_assistant_stream(self, thread_id: str, assistant_id: str):
+        """
+        Run an assistant on a thread, yielding response text as it arrives.
+
+        Args:
+            thread_id: ID of the thread
+            assistant_id: ID of the assistant
+
+        Yields:
+            Text deltas of the assistant's response
+
+        Raises:
+            RuntimeError: If the run ends in any status other than
+                completed. Transport errors from the stream propagate
+                as-is. Either way the caller must not persist the
+                partial text it has received.
+        """
+        with self.client.beta.threads.runs.stream(
+            thread_id=thread_id,
+            assistant_id=assistant_id
+        ) as stream:
+            for event in stream:
+                if event.event == "thread.message.delta":
+                    for content in event.data.delta.content or []:
+                        if content.type == "text" and content.text and content.text.value:
+                            yield content.text.value
+            run = stream.get_final_run()
+
+        if run and run.status != "completed":
+            raise RuntimeError(f"Assistant run ended with status: {run.status}")
+
     def run_assistant(self, thread_id: str, assistant_id: str) -> Optional[Dict[str, Any]]:
         """
-        Run an assistant on a thread.
+        Run an assistant on a thread and wait for the response.
+
+        Uses the streaming API under the hood, so there are no status
+        polls; callers that want incremental output should use
+        run_assistant_stream instead. Only the newest message is fetched
+        afterwards — the run just produced it — so the payload stays
+        constant-size however long the thread is.
 
         Args:
             thread_id: ID of the thread
             assistant_id: ID of the assistant
 
         Returns:
-            Run result data or None if run failed
+            Dict with the run and the latest message, or None if the
+            run failed
         """
         try:
-            # Create a run
-            run = self.client.beta.threads.runs.create(
+            with self.client.beta.threads.runs.stream(
                 thread_id=thread_id,
                 assistant_id=assistant_id
-            )
+            ) as stream:
+                stream.until_done()
+                run = stream.get_final_run()
 
-            # Wait for the run to complete
-            while True:
-                run_status = self.client.beta.threads.runs.retrieve(
-                    thread_id=thread_id,
-                    run_id=run.id
-                )
+            if run and run.status != "completed":
+                logging.error(f"Run failed with status: {run.status}")
+                return None
+
+            # Fetch exactly the one new message instead of the history
+            messages = self.client.beta.threads.messages.list(
+                thread_id=thread_id,
+                order="desc",
+                limit=1
+            )
+            latest = messages.data[0] if messages.data else None
 
-                if run_status.status == "completed":
-                    # Get the messages from the thread
-                    messages = self.client.beta.threads.messages.list(thread_id=thread_id)
-                    return {
-                        "run": run_status,
-                        "messages": messages.data
-                    }
-                elif run_status.status in ["failed", "cancelled", "expired"]:
-                    logging.error(f"Run failed with status: {run_status.status}")
-                    return None
+            return {
+                "run": run,
+                "latest": latest
+            }
 
         except Exception as e:
             logging.error(f"Failed to run OpenAI assistant: {e}")
@@ -240,5 +307,16 @@ class OpenAIService:
             return False
 
 
+@st.cache_resource(show_spinner=False)
+def get_openai_service() -> OpenAIService:
+    """
+    Get the shared OpenAIService instance.
+
+    Returns:
+        The process-wide OpenAIService instance
+    """
+    return OpenAIService()
+
+
 # Create a singleton instance
-openai_service = OpenAIService()
+openai_service = get_openai_service()
@@ -0,0 +1,109 @@
+"""
+Postgres connection pool for the AI Teaching Assistant Platform.
+Provides a process-wide asyncpg pool for direct database queries.
+
+All asyncpg work runs on one persistent background event loop: the pool
+binds to the loop that created it, so coroutines submitted from the
+script thread go through run_async rather than asyncio.run (which would
+spin up and close a fresh loop per call, leaving the cached pool bound
+to a dead loop and every later acquire failing).
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+import asyncpg
+
+from config.settings import SUPABASE_DB_URL
+
+T = TypeVar("T")
+
+
+# Persistent loop the pool lives on, started lazily on first use
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+# Process-wide pool, created lazily on first use
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the persistent background event loop, starting it on first use.
+
+    Returns:
+        The process-wide event loop running on a daemon thread
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, daemon=True, name="pg-pool-loop"
+            ).start()
+            _loop = loop
+
+    return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the persistent loop and wait for its result.
+
+    Args:
+        coro: The coroutine to run
+
+    Returns:
+        Whatever the coroutine returns
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+async def get_pool() -> asyncpg.Pool:
+    """
+    Get the shared asyncpg connection pool, creating it on first use.
+
+    Returns:
+        The process-wide asyncpg pool
+
+    Raises:
+        RuntimeError: If SUPABASE_DB_URL is not configured
+    """
+    global _pool
+
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                if not SUPABASE_DB_URL:
+                    raise RuntimeError("SUPABASE_DB_URL is not configured")
+
+                try:
+                    _pool = await asyncpg.create_pool(
+                        dsn=SUPABASE_DB_URL,
+                        min_size=2,
+                        max_size=10,
+                        max_inactive_connection_lifetime=300,
+                        command_timeout=30,
+                        # Required for Supavisor/PgBouncer transaction mode
+                        statement_cache_size=0
+                    )
+                except Exception as e:
+                    logging.error(f"Failed to create Postgres connection pool: {e}")
+                    raise
+
+    return _pool
+
+
+async def close_pool() -> None:
+    """
+    Close the shared connection pool if it exists.
+    """
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,118 @@
+"""
+Cached query wrappers for the AI Teaching Assistant Platform.
+Wraps DatabaseService reads with Streamlit's cache so script reruns
+triggered by widget interactions don't re-hit Supabase.
+"""
+
+import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
+
+from services.database_service import db_service
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_user_assistants(user_id: str, before: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get a page of a user's assistants, cached across Streamlit reruns.
+
+    Args:
+        user_id: ID of the user
+        before: Optional created_at cursor for paging
+
+    Returns:
+        Tuple of (assistant rows, next cursor or None)
+    """
+    return db_service.get_user_assistants(user_id, before=before)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_assistant(assistant_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get an assistant, cached across Streamlit reruns.
+
+    Assistant rows change only through the manage page, which clears
+    this cache, so a long TTL is safe.
+
+    Args:
+        assistant_id: ID of the assistant
+
+    Returns:
+        Assistant data or None if not found
+    """
+    return db_service.get_assistant(assistant_id)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_chat_thread(thread_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a chat thread, cached across Streamlit reruns.
+
+    Args:
+        thread_id: ID of the chat thread
+
+    Returns:
+        Thread data or None if not found
+    """
+    return db_service.get_chat_thread(thread_id)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_thread_messages(thread_id: str) -> List[Dict[str, Any]]:
+    """
+    Get a thread's messages, cached across Streamlit reruns.
+
+    Args:
+        thread_id: ID of the chat thread
+
+    Returns:
+        List of message data, oldest first
+    """
+    return db_service.get_thread_messages(thread_id)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_assistant_documents(assistant_id: str) -> List[Dict[str, Any]]:
+    """
+    Get an assistant's documents, cached across Streamlit reruns.
+
+    Args:
+        assistant_id: ID of the assistant
+
+    Returns:
+        List of document data
+    """
+    return db_service.get_assistant_documents(assistant_id)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_user_chat_threads(user_id: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Get a page of a user's chat threads, cached across Streamlit reruns.
+
+    Args:
+        user_id: ID of the user
+        limit: Maximum number of threads to return
+        offset: Number of threads to skip, for paging
+
+    Returns:
+        List of thread data with embedded assistant names
+    """
+    return db_service.get_user_chat_threads_with_assistants(user_id, limit=limit, offset=offset)
+
+
+def clear_assistant_caches() -> None:
+    """
+    Invalidate cached assistant reads after a create/update/delete.
+    """
+    cached_user_assistants.clear()
+    cached_assistant.clear()
+    cached_assistant_documents.clear()
+
+
+def clear_chat_caches() -> None:
+    """
+    Invalidate cached chat reads after a thread is created or deleted.
+    """
+    cached_user_chat_threads.clear()
+    cached_chat_thread.clear()
+    cached_thread_messages.clear()
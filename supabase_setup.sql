@@ -35,13 +35,14 @@ CREATE TABLE assistants (
 CREATE TABLE documents (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users(id),
-    assistant_id UUID REFERENCES assistants(id),
+    assistant_id UUID REFERENCES assistants(id) ON DELETE CASCADE,
     filename TEXT NOT NULL,
     file_type TEXT NOT NULL,
     file_size INTEGER NOT NULL,
     openai_file_id TEXT NOT NULL,
     storage_path TEXT NOT NULL,
     file_url TEXT NOT NULL,
+    sha256 TEXT,
     status TEXT DEFAULT 'processing',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -49,10 +50,11 @@ CREATE TABLE documents (
 -- Create chat_threads table
 CREATE TABLE chat_threads (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    assistant_id UUID NOT NULL REFERENCES assistants(id),
+    assistant_id UUID NOT NULL REFERENCES assistants(id) ON DELETE CASCADE,
     user_id UUID NOT NULL REFERENCES users(id),
     name TEXT,
-    openai_thread_id TEXT NOT NULL,
+    -- NULL until the first prompt; the OpenAI thread is created lazily
+    openai_thread_id TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     last_message_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -60,7 +62,7 @@ CREATE TABLE chat_threads (
 -- Create chat_messages table
 CREATE TABLE chat_messages (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    thread_id UUID NOT NULL REFERENCES chat_threads(id),
+    thread_id UUID NOT NULL REFERENCES chat_threads(id) ON DELETE CASCADE,
     role TEXT NOT NULL,
     content TEXT NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -69,20 +71,54 @@ CREATE TABLE chat_messages (
 -- Create vector_stores table
 CREATE TABLE vector_stores (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    assistant_id UUID NOT NULL REFERENCES assistants(id),
+    assistant_id UUID NOT NULL REFERENCES assistants(id) ON DELETE CASCADE,
     openai_vector_store_id TEXT NOT NULL,
     name TEXT NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Insert a chat message and touch the parent thread's last_message_at
+-- in one atomic statement (single round trip from the application)
+CREATE OR REPLACE FUNCTION insert_message_and_touch_thread(p_thread UUID, p_role TEXT, p_content TEXT)
+RETURNS SETOF chat_messages
+LANGUAGE sql
+AS $$
+    UPDATE chat_threads SET last_message_at = NOW() WHERE id = p_thread;
+    INSERT INTO chat_messages (thread_id, role, content)
+    VALUES (p_thread, p_role, p_content)
+    RETURNING *;
+$$;
+-- History-page read model: dates formatted to days server-side and the
+-- assistant name joined in, so the UI does no per-row formatting work
+-- (security_invoker keeps row-level security applied to the caller)
+CREATE VIEW chat_threads_list WITH (security_invoker = on) AS
+SELECT
+    t.id,
+    t.user_id,
+    t.assistant_id,
+    t.name,
+    t.openai_thread_id,
+    t.last_message_at,
+    to_char(t.created_at, 'YYYY-MM-DD') AS created_day,
+    to_char(t.last_message_at, 'YYYY-MM-DD') AS last_day,
+    a.name AS assistant_name
+FROM chat_threads t
+JOIN assistants a ON a.id = t.assistant_id;
+
 -- Create indexes for better query performance
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_assistants_user_id ON assistants(user_id);
+CREATE INDEX assistants_user_created_idx ON assistants(user_id, created_at DESC);
 CREATE INDEX idx_documents_assistant_id ON documents(assistant_id);
 CREATE INDEX idx_documents_user_id ON documents(user_id);
+-- Content-hash lookups for upload dedupe
+CREATE INDEX idx_documents_assistant_sha256 ON documents(assistant_id, sha256);
 CREATE INDEX idx_chat_threads_assistant_id ON chat_threads(assistant_id);
 CREATE INDEX idx_chat_threads_user_id ON chat_threads(user_id);
 CREATE INDEX idx_chat_messages_thread_id ON chat_messages(thread_id);
+-- Composite indexes so ordered reads are index scans instead of sorts
+CREATE INDEX chat_messages_thread_created_idx ON chat_messages(thread_id, created_at);
+CREATE INDEX chat_threads_user_last_message_idx ON chat_threads(user_id, last_message_at DESC);
 CREATE INDEX idx_vector_stores_assistant_id ON vector_stores(assistant_id);
 
 -- Enable Row Level Security (RLS) policies
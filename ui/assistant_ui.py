@@ -8,6 +8,29 @@ from typing import Dict, Any, List, Optional
 
 from services.database_service import db_service
 from services.openai_service import openai_service
+from services.query_cache import (
+    cached_assistant,
+    cached_assistant_documents,
+    cached_user_assistants,
+    clear_assistant_caches
+)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_instructions(openai_assistant_id: str) -> str:
+    """
+    Get an assistant's instructions from OpenAI, cached across reruns.
+
+    Args:
+        openai_assistant_id: ID of the assistant in OpenAI
+
+    Returns:
+        The assistant's instructions, or an empty string if unavailable
+    """
+    openai_assistant = openai_service.get_assistant(openai_assistant_id)
+    if openai_assistant:
+        return openai_assistant.instructions or ""
+    return ""
 
 
 def create_assistant_ui(user_id: str) -> None:
@@ -55,6 +78,7 @@ def create_assistant_ui(user_id: str) -> None:
                     if db_assistant:
                         st.success(f"Assistant '{name}' created successfully!")
                         # Refresh the page to show the new assistant
+                        clear_assistant_caches()
                         st.rerun()
                     else:
                         st.error("Failed to create assistant in the database.")
@@ -70,14 +94,21 @@ def list_assistants_ui(user_id: str) -> None:
         user_id: ID of the current user
     """
     st.header("Your Assistants")
-    
-    # Get the user's assistants
-    assistants = db_service.get_user_assistants(user_id)
-    
+
+    # Walk the keyset cursors loaded so far; each page is cached across
+    # reruns, so re-accumulating the list on a rerun is session-state
+    # lookups, not queries
+    cursors = st.session_state.setdefault("assistant_cursors", [None])
+    assistants = []
+    next_cursor = None
+    for cursor in cursors:
+        page, next_cursor = cached_user_assistants(user_id, before=cursor)
+        assistants.extend(page)
+
     if not assistants:
         st.info("You haven't created any assistants yet.")
         return
-    
+
     # Display assistants in a grid
     cols = st.columns(3)
     
@@ -104,6 +135,12 @@ def list_assistants_ui(user_id: str) -> None:
                         st.session_state["current_page"] = "manage_assistant"
                         st.rerun()
 
+    # A trailing cursor means the last page was full; offer the next one
+    if next_cursor:
+        if st.button("Load more assistants"):
+            cursors.append(next_cursor)
+            st.rerun()
+
 
 def manage_assistant_ui(assistant_id: str, user_id: str) -> None:
     """
@@ -113,8 +150,8 @@ def manage_assistant_ui(assistant_id: str, user_id: str) -> None:
         assistant_id: ID of the assistant to manage
         user_id: ID of the current user
     """
-    # Get the assistant from the database
-    assistant = db_service.get_assistant(assistant_id)
+    # Get the assistant (cached across reruns)
+    assistant = cached_assistant(assistant_id)
     
     if not assistant:
         st.error("Assistant not found.")
@@ -136,12 +173,10 @@ def manage_assistant_ui(assistant_id: str, user_id: str) -> None:
             name = st.text_input("Assistant Name", value=assistant["name"])
             description = st.text_area("Description", value=assistant.get("description", ""))
             
-            # Get the OpenAI assistant to get the instructions
-            openai_assistant = openai_service.get_assistant(assistant["openai_assistant_id"])
-            instructions = ""
-            if openai_assistant:
-                instructions = openai_assistant.instructions or ""
-            
+            # Get the instructions from OpenAI (cached, so tab switches
+            # and widget edits don't re-hit the API)
+            instructions = _cached_instructions(assistant["openai_assistant_id"])
+
             instructions = st.text_area("Instructions", value=instructions)
             
             submit = st.form_submit_button("Update Assistant")
@@ -163,6 +198,10 @@ def manage_assistant_ui(assistant_id: str, user_id: str) -> None:
                     )
                     
                     if updated_openai:
+                        # Drop the cached instructions so the form shows
+                        # the updated values on the next rerun
+                        _cached_instructions.clear()
+
                         # Update the assistant in the database
                         updated_db = db_service.update_assistant(
                             assistant_id=assistant_id,
@@ -174,6 +213,7 @@ def manage_assistant_ui(assistant_id: str, user_id: str) -> None:
                         
                         if updated_db:
                             st.success("Assistant updated successfully!")
+                            clear_assistant_caches()
                         else:
                             st.error("Failed to update assistant in the database.")
                     else:
@@ -183,59 +223,75 @@ def manage_assistant_ui(assistant_id: str, user_id: str) -> None:
         # Document management
         st.subheader("Documents")
         
-        # Get the assistant's documents
-        documents = db_service.get_assistant_documents(assistant_id)
+        # Get the assistant's documents (cached across reruns)
+        documents = cached_assistant_documents(assistant_id)
         
-        # Upload new document
-        st.write("Upload a new document:")
-        uploaded_file = st.file_uploader(
-            "Choose a file",
+        # Upload new documents
+        st.write("Upload new documents:")
+        uploaded_files = st.file_uploader(
+            "Choose files",
             type=["pdf", "docx", "doc", "txt", "md"],
+            accept_multiple_files=True,
             key=f"upload_{assistant_id}"
         )
-        
-        if uploaded_file:
+
+        if uploaded_files:
             from services.document_service import document_service
-            
-            with st.spinner("Processing document..."):
-                # Process the uploaded file
-                document = document_service.process_file(
-                    file=uploaded_file,
-                    filename=uploaded_file.name,
+
+            with st.spinner("Processing documents..."):
+                # Process the batch concurrently; one spinner covers
+                # roughly one upload's worth of latency
+                results = document_service.process_files(
+                    files=uploaded_files,
                     user_id=user_id,
                     assistant_id=assistant_id
                 )
-                
-                if document:
-                    st.success(f"Document '{uploaded_file.name}' uploaded successfully!")
+
+                succeeded = sum(1 for document in results if document)
+                if succeeded:
+                    st.success(f"{succeeded} document(s) uploaded successfully!")
                     # Refresh the documents list
-                    documents = db_service.get_assistant_documents(assistant_id)
-                else:
-                    st.error(f"Failed to upload document '{uploaded_file.name}'.")
+                    clear_assistant_caches()
+                    documents = cached_assistant_documents(assistant_id)
+                if succeeded < len(uploaded_files):
+                    failed = [
+                        file.name
+                        for file, document in zip(uploaded_files, results)
+                        if not document
+                    ]
+                    st.error(f"Failed to upload: {', '.join(failed)}")
         
         # Display existing documents
         if documents:
             st.write("Existing documents:")
-            
+
             for doc in documents:
-                col1, col2, col3 = st.columns([3, 1, 1])
-                
+                col1, col2 = st.columns([3, 1])
+
                 with col1:
                     st.write(doc["filename"])
-                
+
                 with col2:
                     st.write(f"Status: {doc['status']}")
-                
-                with col3:
-                    if st.button("Delete", key=f"delete_{doc['id']}"):
-                        with st.spinner("Deleting document..."):
-                            # Delete the document from the database only
-                            if db_service.delete_document(doc["id"]):
-                                st.success(f"Document '{doc['filename']}' deleted successfully!")
-                                # Refresh the documents list
-                                st.rerun()
-                            else:
-                                st.error("Failed to delete document from the database.")
+
+            # One multiselect + one bulk delete call, instead of a
+            # button (and a rerun, and a DB round-trip) per row
+            selected = st.multiselect(
+                "Delete documents",
+                documents,
+                format_func=lambda d: d["filename"],
+                key=f"delete_select_{assistant_id}"
+            )
+
+            if st.button("Delete selected", disabled=not selected):
+                with st.spinner("Deleting documents..."):
+                    if db_service.delete_documents_bulk([d["id"] for d in selected]):
+                        st.success(f"{len(selected)} document(s) deleted successfully!")
+                        # Refresh the documents list
+                        clear_assistant_caches()
+                        st.rerun()
+                    else:
+                        st.error("Failed to delete documents from the database.")
         else:
             st.info("No documents uploaded yet.")
     
@@ -259,7 +315,8 @@ def manage_assistant_ui(assistant_id: str, user_id: str) -> None:
                         # Delete the assistant from the database
                         if db_service.delete_assistant(assistant_id):
                             st.success("Assistant deleted successfully!")
-                            
+                            clear_assistant_caches()
+
                             # Navigate back to the assistants list
                             st.session_state["current_assistant_id"] = None
                             st.session_state["current_page"] = "assistants"
@@ -3,11 +3,44 @@ Authentication UI components for the AI Teaching Assistant Platform.
 Provides UI elements for user authentication.
 """
 
+import re
+import threading
+import time
+
 import streamlit as st
 from typing import Dict, Any, Tuple, Optional
 
 from services.auth_service import auth_service
 
+# Cheap client-side shape check; a malformed email would only fail
+# after a full GoTrue round trip otherwise
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Minimum seconds between auth attempts in one session
+AUTH_ATTEMPT_INTERVAL = 1.0
+
+# Start refreshing the auth session when the token is within this many
+# seconds of expiring; otherwise reruns use the cached session
+SESSION_REFRESH_MARGIN = 300
+
+# Serializes background refreshes against reads of the session dict
+_refresh_lock = threading.Lock()
+
+
+def _throttle_auth_attempt() -> bool:
+    """
+    Rate-limit auth attempts within the session.
+
+    Returns:
+        True if this attempt comes too soon after the previous one
+    """
+    now = time.monotonic()
+    last = st.session_state.get("last_auth_attempt")
+    if last is not None and now - last < AUTH_ATTEMPT_INTERVAL:
+        return True
+    st.session_state["last_auth_attempt"] = now
+    return False
+
 
 def login_ui() -> Optional[Dict[str, Any]]:
     """
@@ -27,7 +60,17 @@ def login_ui() -> Optional[Dict[str, Any]]:
             if not email or not password:
                 st.error("Please enter both email and password.")
                 return None
-            
+
+            # Reject malformed emails and rapid retries before spending
+            # a network round trip on an attempt that can't succeed
+            if not _EMAIL_RE.match(email):
+                st.error("Please enter a valid email address.")
+                return None
+
+            if _throttle_auth_attempt():
+                st.warning("Please wait a moment before trying again.")
+                return None
+
             success, result = auth_service.sign_in(email, password)
             
             if success:
@@ -50,14 +93,16 @@ def login_ui() -> Optional[Dict[str, Any]]:
                             user_email = user_dict.get("email")
                 
                 # Create a simple dictionary structure that we can easily access
+                session = result.get("session")
                 user_data = {
                     "user": {
                         "id": user_id,
                         "email": user_email
                     },
-                    "session": result.get("session")
+                    "session": session,
+                    "expires_at": getattr(session, "expires_at", None)
                 }
-                
+
                 return user_data
             else:
                 error_msg = "Unknown error"
@@ -93,7 +138,17 @@ def signup_ui() -> Optional[Dict[str, Any]]:
             if password != password_confirm:
                 st.error("Passwords do not match.")
                 return None
-            
+
+            # Same pre-flight checks as login: malformed emails and
+            # rapid retries never reach the network
+            if not _EMAIL_RE.match(email):
+                st.error("Please enter a valid email address.")
+                return None
+
+            if _throttle_auth_attempt():
+                st.warning("Please wait a moment before trying again.")
+                return None
+
             success, result = auth_service.sign_up(email, password, full_name)
             
             if success:
@@ -171,6 +226,59 @@ def profile_ui() -> None:
     logout_ui()
 
 
+def _refresh_session(user_data: Dict[str, Any]) -> None:
+    """
+    Refresh the auth session and swap it into the shared session dict.
+
+    Runs either inline or on a background thread; the dict is mutated in
+    place under the lock so the rerunning script always sees a coherent
+    session/expires_at pair.
+
+    Args:
+        user_data: The session dict stored in st.session_state["user"]
+    """
+    try:
+        session = auth_service.refresh_session()
+        if session:
+            with _refresh_lock:
+                user_data["session"] = session
+                user_data["expires_at"] = getattr(session, "expires_at", None)
+    finally:
+        user_data.pop("_refreshing", None)
+
+
+def _refresh_session_if_needed() -> None:
+    """
+    Refresh the cached auth session when its token is near expiry.
+
+    Streamlit reruns the script on every interaction; hitting GoTrue each
+    time would cost a network round trip per click, so the cached session
+    is trusted until it nears expiry. While the token is still valid the
+    refresh happens on a daemon thread, so no rerun ever blocks on it;
+    only an already-expired token is refreshed inline.
+    """
+    user_data = st.session_state.get("user")
+    if not user_data:
+        return
+
+    expires_at = user_data.get("expires_at")
+    now = time.time()
+    if expires_at and expires_at - now > SESSION_REFRESH_MARGIN:
+        return
+
+    if expires_at and expires_at > now:
+        # Still valid: refresh in the background before it lapses
+        if not user_data.get("_refreshing"):
+            user_data["_refreshing"] = True
+            threading.Thread(
+                target=_refresh_session, args=(user_data,), daemon=True
+            ).start()
+        return
+
+    # Expired (or expiry unknown): refresh before any service call fails
+    _refresh_session(user_data)
+
+
 def require_auth() -> Optional[Dict[str, Any]]:
     """
     Require authentication to access the page.
@@ -181,6 +289,9 @@ def require_auth() -> Optional[Dict[str, Any]]:
     """
     # Check if user is already logged in
     if "user" in st.session_state:
+        # Revalidate only when the token is near expiry
+        _refresh_session_if_needed()
+
         # Display profile in sidebar
         profile_ui()
         return st.session_state["user"]
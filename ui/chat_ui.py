@@ -3,12 +3,113 @@ Chat UI components for the AI Teaching Assistant Platform.
 Provides UI elements for the chat interface.
 """
 
-import streamlit as st
+from __future__ import annotations
+
+import asyncio
+import logging
 import time
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
+from config.settings import SUPABASE_DB_URL
 from services.database_service import db_service
 from services.openai_service import openai_service
+from services.pg_pool import run_async
+from services.query_cache import (
+    cached_assistant,
+    cached_thread_messages,
+    cached_user_chat_threads,
+    clear_chat_caches
+)
+
+# Threads rendered per page of the history list
+PAGE_SIZE = 10
+
+# Opening message shown in every new thread; kept client-side so thread
+# creation doesn't spend a round trip writing a constant to OpenAI
+WELCOME_MESSAGE = (
+    "Hey there! "
+    "I'm here to quiz you one question at a time based on the key topics from your teacher's unit review sheet. "
+    "If you get a question right, we'll move forward. If you're unsure or make a mistake, no worries — "
+    "I'll guide you with a follow-up or hint to help you lock it in. Ready to start?"
+)
+
+
+def _load_chat_context(thread_id: str, assistant_id: str,
+                       include_messages: bool = True) -> Tuple[Optional[Dict[str, Any]],
+                                                               Optional[List[Dict[str, Any]]],
+                                                               Optional[Dict[str, Any]]]:
+    """
+    Load the thread, its messages and the owning assistant for the chat page.
+
+    The reads are independent, so when the Postgres pool is configured
+    they are issued concurrently and cost roughly one round trip instead
+    of one each. Callers that already hold the transcript in session
+    state pass include_messages=False to skip that read entirely.
+
+    Args:
+        thread_id: ID of the chat thread
+        assistant_id: ID of the assistant
+        include_messages: Whether to also fetch the thread's messages
+
+    Returns:
+        Tuple of (thread, messages, assistant); messages is None when
+        include_messages is False
+    """
+    if SUPABASE_DB_URL:
+        async def _gather():
+            if include_messages:
+                return await asyncio.gather(
+                    db_service.aget_chat_thread(thread_id),
+                    db_service.aget_thread_messages(thread_id),
+                    db_service.aget_assistant(assistant_id)
+                )
+            thread, assistant = await asyncio.gather(
+                db_service.aget_chat_thread(thread_id),
+                db_service.aget_assistant(assistant_id)
+            )
+            return thread, None, assistant
+
+        thread, messages, assistant = run_async(_gather())
+        return thread, messages, assistant
+
+    # No direct Postgres access configured; fall back to serial reads
+    return (
+        db_service.get_chat_thread(thread_id),
+        db_service.get_thread_messages(thread_id) if include_messages else None,
+        db_service.get_assistant(assistant_id)
+    )
+
+
+def _coalesce_stream(deltas: Iterator[str], min_ms: int = 50) -> Iterator[str]:
+    """
+    Batch streaming text deltas into roughly min_ms-sized chunks.
+
+    st.write_stream triggers a frontend render per yielded chunk; at
+    typical token rates that is dozens of re-layouts per second.
+    Coalescing deltas into ~50ms batches cuts that by an order of
+    magnitude without visibly hurting perceived latency.
+
+    Args:
+        deltas: Source iterator of text deltas
+        min_ms: Minimum milliseconds between yielded chunks
+
+    Yields:
+        Accumulated text chunks
+    """
+    buffer = ""
+    last = time.monotonic()
+    for delta in deltas:
+        buffer += delta
+        now = time.monotonic()
+        if (now - last) * 1000 >= min_ms:
+            yield buffer
+            buffer = ""
+            last = now
+    if buffer:
+        yield buffer
 
 
 def format_message(role: str, content: str) -> None:
@@ -25,25 +126,81 @@ def format_message(role: str, content: str) -> None:
         st.chat_message("assistant").write(content)
 
 
-def display_chat_history(thread_id: str) -> None:
+def display_chat_history(thread_id: str, messages: Optional[List[Dict[str, Any]]] = None,
+                         tail: int = 50) -> None:
     """
     Display the chat history for a thread.
 
+    The transcript is cached in session state keyed by thread, so reruns
+    triggered by widget interactions render from memory instead of
+    re-querying the database; chat_ui appends new turns to the same key
+    as they are written. Only the last ``tail`` messages are rendered by
+    default — long tutoring threads otherwise accumulate a DOM node per
+    message — with a toggle to reveal the earlier ones.
+
     Args:
         thread_id: ID of the chat thread
+        messages: Optional pre-fetched message list; fetched from the
+            database only when absent from the session cache
+        tail: Number of most recent messages to render unconditionally
     """
-    # Get messages from the database
-    messages = db_service.get_thread_messages(thread_id)
-    
-    # Display messages
-    for message in messages:
+    key = f"messages::{thread_id}"
+    if key not in st.session_state:
+        # Get messages from the cached read unless the caller has them
+        if messages is None:
+            messages = cached_thread_messages(thread_id)
+        st.session_state[key] = list(messages)
+
+    messages = st.session_state[key]
+    older = messages[:-tail]
+    recent = messages[-tail:]
+
+    # The toggle's key keeps the choice in session state across reruns;
+    # when it's off the earlier messages cost nothing to render
+    if older:
+        if st.toggle(f"Show {len(older)} earlier messages", key=f"expanded::{thread_id}"):
+            for message in older:
+                format_message(message["role"], message["content"])
+
+    # Display the recent window
+    for message in recent:
         format_message(message["role"], message["content"])
 
 
+def _ensure_openai_thread(thread: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the thread's OpenAI thread id, creating it on first use.
+
+    New chats only get a database row; the OpenAI thread is created
+    lazily here when the first real prompt arrives, so abandoned
+    sessions never cost OpenAI round trips.
+
+    Args:
+        thread: The chat thread row (mutated in place with the new id)
+
+    Returns:
+        The OpenAI thread id, or None if creation failed
+    """
+    openai_thread_id = thread.get("openai_thread_id")
+    if openai_thread_id:
+        return openai_thread_id
+
+    openai_thread = openai_service.create_thread()
+    if not openai_thread:
+        return None
+
+    db_service.update_chat_thread(thread["id"], {"openai_thread_id": openai_thread.id})
+    thread["openai_thread_id"] = openai_thread.id
+    return openai_thread.id
+
+
 def create_thread_ui(assistant_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     """
     Create a new chat thread with an initial welcome message.
 
+    Only the database row is created here; the OpenAI thread is deferred
+    to the first real prompt (see _ensure_openai_thread).
+
     Args:
         assistant_id: ID of the assistant
         user_id: ID of the user
@@ -51,46 +208,29 @@ def create_thread_ui(assistant_id: str, user_id: str) -> Optional[Dict[str, Any]
     Returns:
         Created thread data or None if failed
     """
-    # Create a thread in OpenAI
-    openai_thread = openai_service.create_thread()
-    
-    if not openai_thread:
-        st.error("Failed to create chat thread.")
-        return None
-    
-    # Create a thread in the database
+    # Create a thread in the database; openai_thread_id stays NULL until
+    # the first prompt
     thread = db_service.create_chat_thread(
         assistant_id=assistant_id,
-        user_id=user_id,
-        openai_thread_id=openai_thread.id
+        user_id=user_id
     )
-    
+
     if not thread:
         st.error("Failed to create chat thread in the database.")
         return None
-    
-    # Add welcome message from assistant
-    welcome_message = (
-        "Hey there! "
-        "I'm here to quiz you one question at a time based on the key topics from your teacher's unit review sheet. "
-        "If you get a question right, we'll move forward. If you're unsure or make a mistake, no worries — "
-        "I'll guide you with a follow-up or hint to help you lock it in. Ready to start?"
-    )
-    
-    # Create the welcome message in OpenAI
-    openai_service.client.beta.threads.messages.create(
-        thread_id=openai_thread.id,
-        role="assistant",
-        content=welcome_message
-    )
-    
-    # Save welcome message to database
+
+    # Invalidate the cached thread list so the new thread shows up
+    clear_chat_caches()
+
+    # Save the welcome message to the database only; the OpenAI thread
+    # gets the context prepended to the first real user prompt instead,
+    # saving a round trip on every new chat
     db_service.create_chat_message(
         thread_id=thread["id"],
         role="assistant",
-        content=welcome_message
+        content=WELCOME_MESSAGE
     )
-    
+
     return thread
 
 
@@ -102,99 +242,158 @@ def chat_ui(assistant_id: str, user_id: str) -> None:
         assistant_id: ID of the assistant
         user_id: ID of the user
     """
-    # Get the assistant from the database
-    assistant = db_service.get_assistant(assistant_id)
-    
+    # Check if we have a current thread
+    current_thread_id = st.session_state.get("current_thread_id")
+
+    if current_thread_id:
+        # Drop the cached transcript of a previously viewed thread
+        prev_thread_id = st.session_state.get("_messages_thread_id")
+        if prev_thread_id and prev_thread_id != current_thread_id:
+            st.session_state.pop(f"messages::{prev_thread_id}", None)
+        st.session_state["_messages_thread_id"] = current_thread_id
+
+        # The thread and assistant rows don't change for the duration of
+        # a session; serve them from session state after the first load
+        cached = f"messages::{current_thread_id}" in st.session_state
+        thread_key = f"thread::{current_thread_id}"
+        assistant_key = f"assistant::{assistant_id}"
+        thread = st.session_state.get(thread_key)
+        assistant = st.session_state.get(assistant_key)
+
+        if thread and assistant:
+            messages = None
+            if not cached:
+                messages = cached_thread_messages(current_thread_id)
+        else:
+            # First load: fetch thread, messages and assistant
+            # concurrently; skip the message read when the transcript is
+            # already in session state
+            thread, messages, assistant = _load_chat_context(
+                current_thread_id, assistant_id, include_messages=not cached
+            )
+            if thread:
+                st.session_state[thread_key] = thread
+            if assistant:
+                st.session_state[assistant_key] = assistant
+    else:
+        thread = None
+        messages = None
+        assistant = st.session_state.get(f"assistant::{assistant_id}")
+        if assistant is None:
+            assistant = cached_assistant(assistant_id)
+            if assistant:
+                st.session_state[f"assistant::{assistant_id}"] = assistant
+
     if not assistant:
         st.error("Assistant not found.")
         return
-    
+
     # Check if the assistant belongs to the current user
     if assistant["user_id"] != user_id:
         st.error("You don't have permission to chat with this assistant.")
         return
-    
+
     st.title(f"Test Preparation with {assistant['name']}")
-    
-    # Check if we have a current thread
-    current_thread_id = st.session_state.get("current_thread_id")
-    
+
     if not current_thread_id:
         # Create a new thread
         thread = create_thread_ui(assistant_id, user_id)
-        
+
         if thread:
             st.session_state["current_thread_id"] = thread["id"]
             current_thread_id = thread["id"]
+            st.session_state["_messages_thread_id"] = current_thread_id
+            st.session_state[f"thread::{current_thread_id}"] = thread
         else:
             return
-    
-    # Get the thread from the database
-    thread = db_service.get_chat_thread(current_thread_id)
-    
+
     if not thread:
         st.error("Chat thread not found.")
         return
-    
+
     # Display chat history
-    display_chat_history(current_thread_id)
+    display_chat_history(current_thread_id, messages)
     
     # Chat input
     if prompt := st.chat_input("Type your message here..."):
+        # Make sure the OpenAI thread exists; new chats defer its
+        # creation until this first prompt
+        openai_thread_id = _ensure_openai_thread(thread)
+        if not openai_thread_id:
+            st.error("Failed to create chat thread.")
+            return
+
         # Display user message
         format_message("user", prompt)
         
-        # Save user message to database
-        db_service.create_chat_message(
-            thread_id=current_thread_id,
-            role="user",
-            content=prompt
-        )
-        
-        # Create a message in the OpenAI thread
-        openai_service.create_message(
-            thread_id=thread["openai_thread_id"],
-            content=prompt
-        )
+        transcript = st.session_state[f"messages::{current_thread_id}"]
+
+        # The OpenAI thread never saw the welcome message (it was only
+        # written to the database), so carry it as context on the very
+        # first user prompt
+        openai_prompt = prompt
+        if not any(message["role"] == "user" for message in transcript):
+            openai_prompt = f"(Tutor's opening message: {WELCOME_MESSAGE})\n\n{prompt}"
+
+        # Record the user turn in the session transcript
+        transcript.append({"role": "user", "content": prompt})
+
+        # Post the prompt to the OpenAI thread and persist the user turn
+        # concurrently — the two writes are independent, so the turn
+        # costs the slower of the two rather than their sum
+        if SUPABASE_DB_URL:
+            async def _send_user_turn():
+                return await asyncio.gather(
+                    openai_service.acreate_message(openai_thread_id, openai_prompt),
+                    db_service.acreate_chat_message(current_thread_id, "user", prompt)
+                )
+
+            run_async(_send_user_turn())
+        else:
+            openai_service.create_message(
+                thread_id=openai_thread_id,
+                content=openai_prompt
+            )
+            db_service.create_chat_message(
+                thread_id=current_thread_id,
+                role="user",
+                content=prompt
+            )
         
-        # Run the assistant
-        with st.spinner("Thinking..."):
-            result = openai_service.run_assistant(
-                thread_id=thread["openai_thread_id"],
-                assistant_id=assistant["openai_assistant_id"]
+        # Stream the assistant's response; tokens render as they arrive
+        # instead of blocking until the full run completes
+        with st.chat_message("assistant"):
+            try:
+                assistant_response = st.write_stream(
+                    _coalesce_stream(
+                        openai_service.run_assistant_stream(
+                            thread_id=openai_thread_id,
+                            assistant_id=assistant["openai_assistant_id"]
+                        )
+                    )
+                )
+            except Exception as e:
+                # The run failed or the stream dropped; whatever partial
+                # text rendered must not be saved as a complete turn
+                logging.error(f"Assistant response failed mid-stream: {e}")
+                st.error("The assistant couldn't finish its response. Please try again.")
+                assistant_response = None
+
+        if assistant_response:
+            # Save assistant message to database and the session
+            # transcript once the stream has finished
+            db_service.create_chat_message(
+                thread_id=current_thread_id,
+                role="assistant",
+                content=assistant_response
             )
-            
-            if result:
-                # Get the latest message (assistant's response)
-                messages = result.get("messages", [])
-                
-                if messages:
-                    # Get the last message from the assistant
-                    # Note: messages are already in newest-first order from the API
-                    for message in messages:
-                        if message.role == "assistant":
-                            # Display assistant message
-                            assistant_response = ""
-                            
-                            # Process the message content
-                            for content_item in message.content:
-                                if content_item.type == "text":
-                                    assistant_response = content_item.text.value
-                            
-                            if assistant_response:
-                                # Display the message
-                                format_message("assistant", assistant_response)
-                                
-                                # Save assistant message to database
-                                db_service.create_chat_message(
-                                    thread_id=current_thread_id,
-                                    role="assistant",
-                                    content=assistant_response
-                                )
-                            
-                            break
-            else:
-                st.error("Failed to get a response from the assistant.")
+            st.session_state[f"messages::{current_thread_id}"].append(
+                {"role": "assistant", "content": assistant_response}
+            )
+            # The cross-rerun message cache is now stale for this thread
+            cached_thread_messages.clear()
+        else:
+            st.error("Failed to get a response from the assistant.")
 
 
 def chat_history_ui(user_id: str) -> None:
@@ -205,56 +404,96 @@ def chat_history_ui(user_id: str) -> None:
         user_id: ID of the current user
     """
     st.title("Tutor Session History")
-    
-    # Get the user's chat threads
-    threads = db_service.get_user_chat_threads(user_id)
-    
+
+    # Fetch one page of threads; load cost stays O(PAGE_SIZE) however
+    # much history the user has
+    page = st.session_state.get("history_page", 0)
+    threads = cached_user_chat_threads(user_id, limit=PAGE_SIZE, offset=page * PAGE_SIZE)
+
     if not threads:
+        if page > 0:
+            # Ran past the end (e.g. after deletes); snap back to the start
+            st.session_state["history_page"] = 0
+            st.rerun()
         st.info("You don't have any chat history yet.")
         return
-    
-    # Display threads in a list
-    for thread in threads:
-        with st.container(border=True):
-            col1, col2, col3 = st.columns([3, 2, 1])
-            
-            with col1:
-                # Get the assistant name
-                assistant_name = thread.get("assistants", {}).get("name", "Unknown Assistant")
-                st.write(f"**{assistant_name}**")
-                
-                # Show thread name or creation date
-                if thread.get("name"):
-                    st.write(thread["name"])
-                else:
-                    created_at = thread.get("created_at", "")
-                    if created_at:
-                        st.write(f"Created: {created_at[:10]}")
-            
-            with col2:
-                # Show last message time
-                last_message_at = thread.get("last_message_at", "")
-                if last_message_at:
-                    st.write(f"Last message: {last_message_at[:10]}")
-            
-            with col3:
-                # Continue chat button
-                if st.button("Continue", key=f"continue_{thread['id']}"):
-                    # Set the current thread and assistant in session state and navigate to chat
-                    st.session_state["current_assistant_id"] = thread["assistant_id"]
-                    st.session_state["current_thread_id"] = thread["id"]
-                    st.session_state["current_page"] = "chat"
-                    st.rerun()
-                
-                # Delete thread button
-                if st.button("Delete", key=f"delete_{thread['id']}"):
-                    if db_service.delete_chat_thread(thread["id"]):
-                        # Also delete the OpenAI thread
-                        openai_service.delete_thread(thread["openai_thread_id"])
-                        st.success("Chat thread deleted successfully!")
-                        st.rerun()
-                    else:
-                        st.error("Failed to delete chat thread.")
+
+    # Render the page as one dataframe plus a single selector; per-row
+    # containers, columns and buttons cost six-plus widgets per thread
+    # and dominate render/diff time as the list grows
+    st.dataframe(
+        [
+            {
+                "Assistant": thread.get("assistant_name", "Unknown Assistant"),
+                "Session": thread.get("name") or "",
+                "Created": thread.get("created_day") or "",
+                "Last message": thread.get("last_day") or ""
+            }
+            for thread in threads
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+    threads_by_id = {thread["id"]: thread for thread in threads}
+
+    def _thread_label(thread_id: str) -> str:
+        thread = threads_by_id[thread_id]
+        assistant_name = thread.get("assistant_name", "Unknown Assistant")
+        return f"{assistant_name} — {thread.get('name') or thread.get('last_day') or ''}"
+
+    selected_id = st.selectbox(
+        "Select a session",
+        list(threads_by_id),
+        format_func=_thread_label
+    )
+    selected = threads_by_id[selected_id]
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Continue chat button
+        if st.button("Continue"):
+            # Set the current thread and assistant in session state and navigate to chat
+            st.session_state["current_assistant_id"] = selected["assistant_id"]
+            st.session_state["current_thread_id"] = selected["id"]
+            st.session_state["current_page"] = "chat"
+            st.rerun()
+
+    with col2:
+        # Delete thread button
+        if st.button("Delete"):
+            # The database and OpenAI deletes are independent; run them
+            # concurrently so the click blocks on the slower of the two
+            # rather than their sum
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                db_future = executor.submit(
+                    db_service.delete_chat_thread, selected["id"]
+                )
+                # Lazily created threads may never have gotten one
+                if selected.get("openai_thread_id"):
+                    executor.submit(
+                        openai_service.delete_thread, selected["openai_thread_id"]
+                    )
+                db_ok = db_future.result()
+
+            if db_ok:
+                st.success("Chat thread deleted successfully!")
+                clear_chat_caches()
+                st.rerun()
+            else:
+                st.error("Failed to delete chat thread.")
+
+    # Paging controls; a full page may mean more threads exist
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if page > 0 and st.button("← Newer"):
+            st.session_state["history_page"] = page - 1
+            st.rerun()
+    with col_next:
+        if len(threads) == PAGE_SIZE and st.button("Load more"):
+            st.session_state["history_page"] = page + 1
+            st.rerun()
 
 
 def chat_page(user_id: str) -> None:
@@ -270,6 +509,11 @@ def chat_page(user_id: str) -> None:
     if current_assistant_id:
         # Add a back button
         if st.button("← Back to Assistants"):
+            # Drop the session-memoized rows for the chat being left
+            st.session_state.pop(f"assistant::{current_assistant_id}", None)
+            thread_id = st.session_state.get("current_thread_id")
+            if thread_id:
+                st.session_state.pop(f"thread::{thread_id}", None)
             st.session_state["current_assistant_id"] = None
             st.session_state["current_thread_id"] = None
             st.session_state["current_page"] = "assistants"
@@ -8,10 +8,23 @@ import streamlit as st
 from typing import Optional
 
 
+# Set once by configure_streamlit_logging; Streamlit reruns the script
+# top-to-bottom on every interaction, so configuration must not repeat
+_CONFIGURED = False
+
+# One formatter for the process; there is no per-logger state in it
+_FORMATTER = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
 def setup_logging(log_level: int = logging.INFO) -> logging.Logger:
     """
     Set up logging configuration.
 
+    Idempotent: reruns return the already-configured logger instead of
+    attaching another handler (which would duplicate every log line).
+
     Args:
         log_level: Logging level (default: INFO)
 
@@ -22,17 +35,16 @@ def setup_logging(log_level: int = logging.INFO) -> logging.Logger:
     logger = logging.getLogger("ai_teaching_assistant")
     logger.setLevel(log_level)
 
+    # Already configured on a previous run/rerun
+    if logger.handlers:
+        return logger
+
     # Create console handler and set level
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
 
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-
-    # Add formatter to console handler
-    console_handler.setFormatter(formatter)
+    # Attach the shared formatter
+    console_handler.setFormatter(_FORMATTER)
 
     # Add console handler to logger
     logger.addHandler(console_handler)
@@ -43,12 +55,20 @@ def setup_logging(log_level: int = logging.INFO) -> logging.Logger:
 def configure_streamlit_logging() -> None:
     """
     Configure Streamlit's logging to use our custom logger.
+
+    Idempotent: only the first call touches the root logger.
     """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    _CONFIGURED = True
+
     # Get the root logger
     root_logger = logging.getLogger()
 
-    # Remove existing handlers
-    for handler in root_logger.handlers:
+    # Remove existing handlers (iterate a copy; removing while iterating
+    # the live list skips every other handler)
+    for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
     # Set up our custom logger
@@ -68,5 +88,7 @@ def log_error(error: Exception, message: Optional[str] = None) -> None:
         message: Optional custom error message
     """
     error_message = message or str(error)
-    logging.error(f"Error: {error_message}", exc_info=True)
+    # Skip the exc_info frame capture entirely when ERROR is disabled
+    if logging.getLogger().isEnabledFor(logging.ERROR):
+        logging.error(f"Error: {error_message}", exc_info=True)
     st.error(error_message)
@@ -0,0 +1,31 @@
+"""
+Worker functions for parallel PDF text extraction.
+
+Kept in a module with no service imports: ProcessPoolExecutor workers
+re-import the function's module under the spawn/forkserver start
+methods, and pulling in the OpenAI/Supabase service singletons there
+would construct API clients (and fail outright without credentials)
+in every worker process.
+"""
+
+from typing import List
+
+
+def extract_pdf_pages(path: str, indices: List[int]) -> List[str]:
+    """
+    Extract text from a batch of PDF pages (runs in a worker process).
+
+    Args:
+        path: Path to the PDF file on disk
+        indices: Page indices to extract
+
+    Returns:
+        Extracted text for each page, in the given order
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return [pdf[i].get_textpage().get_text_range() or "" for i in indices]
+    finally:
+        pdf.close()